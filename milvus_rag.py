@@ -1,34 +1,260 @@
 #!/usr/bin/env python3
 
+import glob
 import json
+import math
+import multiprocessing
 import os
+import queue
 import sys
+import threading
 import argparse
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+import numpy as np
 
 from pymilvus import (
     connections,
     utility,
     Collection,
+    CollectionSchema,
+    FieldSchema,
+    DataType,
 )
 from langchain.chains import ConversationalRetrievalChain
 from langchain.memory import ConversationBufferMemory
 from langchain.vectorstores import Milvus
-from langchain.document_loaders import PyPDFLoader, PyPDFDirectoryLoader
+from langchain.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain.schema import Document
 from langchain_openai import OpenAI
 from langchain_huggingface import HuggingFaceEmbeddings
 from dotenv import load_dotenv
 load_dotenv()
 
+try:
+    from numba import njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+try:
+    import re2 as _regex  # GIL-releasing DFA engine, API-compatible with re
+except ImportError:
+    import re as _regex
+
+if _HAS_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _topk_ip(X, q, k):
+        """Parallel inner-product scores plus serial top-k selection"""
+        n = X.shape[0]
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = np.float32(0.0)
+            for d in range(X.shape[1]):
+                s += X[i, d] * q[d]
+            scores[i] = s
+
+        # k is tiny (<= topk), so repeated max scans beat a full sort
+        out = np.empty(k, dtype=np.int64)
+        for j in range(k):
+            best = 0
+            for i in range(1, n):
+                if scores[i] > scores[best]:
+                    best = i
+            out[j] = best
+            scores[best] = np.float32(-3.4e38)
+        return out
+
+
+def _load_one_pdf(pdf_path: str) -> List:
+    """Load a single PDF into pages (module-level so Pool can pickle it)"""
+    return PyPDFLoader(pdf_path).load()
+
+
+class BatchedHuggingFaceEmbeddings(HuggingFaceEmbeddings):
+    """HuggingFaceEmbeddings with length-sorted batching for faster ingestion"""
+
+    batch_size: int = 128
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts sorted by length so batches pad minimally"""
+        if not texts:
+            return []
+
+        order = np.argsort([len(t) for t in texts])
+        embeddings = self.client.encode(
+            [texts[i] for i in order],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True,
+        )
+
+        # Un-permute back to the caller's order
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return embeddings[inverse].tolist()
+
+
+class ONNXEmbeddings:
+    """Quantized INT8 ONNX Runtime embedding backend for CPU-only ingestion"""
+
+    def __init__(self, model_name: str, cache_dir: str = "./.onnx_cache", batch_size: int = 128):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        # Bare sentence-transformers names need the hub namespace for export
+        hub_name = model_name if '/' in model_name else f"sentence-transformers/{model_name}"
+        onnx_path = self._export_quantized(hub_name, cache_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(hub_name)
+        self.session = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
+        self.batch_size = batch_size
+
+    @staticmethod
+    def _export_quantized(model_name: str, cache_dir: str) -> str:
+        """Export the encoder to ONNX and apply dynamic INT8 quantization (once)"""
+        model_dir = os.path.join(cache_dir, model_name.replace('/', '_'))
+        quantized_path = os.path.join(model_dir, "model_quantized.onnx")
+
+        if not os.path.exists(quantized_path):
+            from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+            print(f"Exporting {model_name} to quantized ONNX (one-time)...")
+            model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+            model.save_pretrained(model_dir)
+            quantizer = ORTQuantizer.from_pretrained(model_dir)
+            quantizer.quantize(
+                save_dir=model_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False),
+            )
+
+        return quantized_path
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Run one forward pass and mean-pool last_hidden_state"""
+        tokens = self.tokenizer(
+            texts,
+            padding=True,
+            truncation=True,
+            max_length=384,
+            return_tensors="np",
+        )
+        # Tokenizer output is already padded SoA arrays; cast in place where
+        # possible (the exported model requires int64 ids)
+        hidden = self.session.run(None, {
+            "input_ids": tokens["input_ids"].astype(np.int64, copy=False),
+            "attention_mask": tokens["attention_mask"].astype(np.int64, copy=False),
+        })[0]
+
+        mask = tokens["attention_mask"][:, :, None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return pooled / np.linalg.norm(pooled, axis=1, keepdims=True)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in length-sorted batches through the ONNX session"""
+        if not texts:
+            return []
+
+        order = np.argsort([len(t) for t in texts])
+        ordered = [texts[i] for i in order]
+
+        # Write each batch straight into one preallocated matrix instead of
+        # collecting per-batch arrays and concatenating at the end
+        embeddings = None
+        pos = 0
+        for i in range(0, len(ordered), self.batch_size):
+            batch = self._encode(ordered[i:i + self.batch_size])
+            if embeddings is None:
+                embeddings = np.empty((len(ordered), batch.shape[1]), dtype=batch.dtype)
+            embeddings[pos:pos + len(batch)] = batch
+            pos += len(batch)
+
+        inverse = np.empty_like(order)
+        inverse[order] = np.arange(len(order))
+        return embeddings[inverse].tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query string"""
+        return self._encode([text])[0].tolist()
+
+
+class FastSplitter:
+    """Single-pass regex splitter, a faster drop-in for the recursive one
+
+    One precompiled alternation over the separator list finds every
+    candidate split point in a single scan (with pyre2 the scan also
+    releases the GIL); chunks are then packed greedily to chunk_size with
+    overlap via binary search over the boundary offsets, instead of the
+    recursive find/slice walk RecursiveCharacterTextSplitter does.
+    """
+
+    _SEPARATORS = ["\n\n", "\n", " "]
+
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 20):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._pattern = _regex.compile("|".join(_regex.escape(s) for s in self._SEPARATORS))
+
+    def split_text(self, text: str) -> List:
+        """Split text into (start_index, chunk) pairs"""
+        n = len(text)
+        if n <= self.chunk_size:
+            return [(0, text)] if text.strip() else []
+
+        boundaries = np.fromiter(
+            (m.end() for m in self._pattern.finditer(text)), dtype=np.int64
+        )
+
+        chunks = []
+        start = 0
+        while start < n:
+            limit = start + self.chunk_size
+            if limit >= n:
+                end = n
+            else:
+                # Farthest separator boundary inside the window; hard cut
+                # if the window contains none
+                idx = int(np.searchsorted(boundaries, limit, side="right")) - 1
+                end = int(boundaries[idx]) if idx >= 0 and boundaries[idx] > start else limit
+
+            chunk = text[start:end]
+            if chunk.strip():
+                chunks.append((start, chunk))
+            if end >= n:
+                break
+            start = max(end - self.chunk_overlap, start + 1)
+
+        return chunks
+
+    def split_documents(self, documents: List) -> List:
+        """Split Documents into chunk Documents, keeping metadata"""
+        chunks = []
+        for doc in documents:
+            for start_index, chunk in self.split_text(doc.page_content):
+                metadata = dict(doc.metadata)
+                metadata["start_index"] = start_index
+                chunks.append(Document(page_content=chunk, metadata=metadata))
+        return chunks
+
+
 class MilvusRAGManager:
     def __init__(self, config_path: str):
         self.config = self._load_config(config_path)
-        self.embeddings = None
-        self.llm = None
+        self._embeddings = None
+        self._llm = None
         self.vector_db = None
         self.collection = None
-        self.text_splitter = None
+        self._text_splitter = None
+        self._exists_cache: Dict[str, bool] = {}
+        self._schema_ready = False
+        self._chain = None
+        self._memory = None
+        self._mem_vectors: Optional[np.ndarray] = None
+        self._mem_docs: Optional[List[Document]] = None
         self._setup_components()
 
     def _load_config(self, config_path: str) -> Dict[str, Any]:
@@ -42,24 +268,77 @@ class MilvusRAGManager:
             raise ValueError(f"Invalid JSON in config file: {e}")
 
     def _setup_components(self):
-        """Initialize all components based on configuration"""
-        # Setup embeddings
+        """Connect to Milvus; heavy components are constructed on first use"""
+        self._connect_milvus()
+
+    @property
+    def embeddings(self):
+        """Embedding backend, built lazily (the model load costs seconds,
+        and operations like drop/stats never need it)"""
+        if self._embeddings is None:
+            self._embeddings = self._build_embeddings()
+        return self._embeddings
+
+    def _build_embeddings(self):
+        """Construct the configured embedding backend"""
+        # Use all cores for intra-op parallelism; containers often default to 1
+        import torch
+        torch.set_num_threads(int(os.environ.get("RAG_TORCH_THREADS", os.cpu_count() or 1)))
+        try:
+            torch.set_num_interop_threads(2)
+        except RuntimeError:
+            pass  # can only be set once per process
+
         model_name = self.config.get('embedding_model', 'all-mpnet-base-v2')
-        self.embeddings = HuggingFaceEmbeddings(model_name=model_name)
-        
-        # Setup LLM
-        self.llm = OpenAI()
-        
-        # Setup text splitter
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.config.get('chunk_size', 500),
-            chunk_overlap=self.config.get('chunk_overlap', 20),
-            length_function=len,
-            add_start_index=True,
+        if self.config.get('use_onnx', False):
+            embeddings = ONNXEmbeddings(
+                model_name,
+                cache_dir=self.config.get('onnx_cache_dir', './.onnx_cache'),
+                batch_size=self.config.get('batch_size', 128),
+            )
+        else:
+            device = self.config.get('device', 'cuda' if torch.cuda.is_available() else 'cpu')
+            embeddings = BatchedHuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": device},
+            )
+            embeddings.batch_size = self.config.get('batch_size', 256 if device == 'cuda' else 128)
+            if device == 'cuda':
+                # FP16 halves VRAM and roughly doubles encode throughput
+                embeddings.client.half()
+
+        # Cache document embeddings on disk keyed by content hash, so
+        # re-ingesting unchanged chunks skips the encoder entirely
+        return CacheBackedEmbeddings.from_bytes_store(
+            embeddings,
+            LocalFileStore(self.config.get('embed_cache_dir', './.embed_cache')),
+            namespace=model_name,
         )
-        
-        # Connect to Milvus
-        self._connect_milvus()
+
+    @property
+    def llm(self):
+        """OpenAI client, built lazily"""
+        if self._llm is None:
+            self._llm = OpenAI()
+        return self._llm
+
+    @property
+    def text_splitter(self):
+        """Text splitter, built lazily"""
+        if self._text_splitter is None:
+            if self.config.get('fast_splitter', True):
+                self._text_splitter = FastSplitter(
+                    chunk_size=self.config.get('chunk_size', 500),
+                    chunk_overlap=self.config.get('chunk_overlap', 20),
+                )
+            else:
+                self._text_splitter = RecursiveCharacterTextSplitter(
+                    chunk_size=self.config.get('chunk_size', 500),
+                    chunk_overlap=self.config.get('chunk_overlap', 20),
+                    length_function=len,
+                    add_start_index=True,
+                )
+        return self._text_splitter
 
     def _connect_milvus(self):
         """Connect to Milvus database"""
@@ -87,22 +366,154 @@ class MilvusRAGManager:
             "port": str(self.config['docker_port'])
         }
 
+    def _estimate_row_count(self) -> int:
+        """Best-effort row count of the current collection (0 if absent)"""
+        collection_name = self.config['collection_name']
+        if utility.has_collection(collection_name):
+            try:
+                return Collection(collection_name).num_entities
+            except Exception:
+                pass
+        return 0
+
+    def _get_ivf_nlist(self) -> int:
+        """Pick nlist from data size (~4*sqrt(N)) unless pinned in config"""
+        if 'nlist' in self.config:
+            return self.config['nlist']
+        return max(128, int(4 * math.sqrt(self._estimate_row_count())))
+
+    def _resolve_index_type(self) -> str:
+        """Pick the index type: config wins, else FLAT below flat_threshold
+
+        Brute-force FLAT beats approximate indexes on small collections
+        (BLAS matmul over contiguous memory) and needs no tuning, so it is
+        the default until the corpus outgrows flat_threshold rows.
+        """
+        index_type = self.config.get('index_type')
+        if index_type:
+            return index_type
+
+        corpus_size = self.config.get('corpus_size') or self._estimate_row_count()
+        if corpus_size < self.config.get('flat_threshold', 500_000):
+            return 'FLAT'
+        return 'HNSW'
+
     def _get_search_params(self) -> Dict[str, Any]:
-        """Get search parameters"""
+        """Get search parameters (metric and params must match the index)"""
+        index_type = self._resolve_index_type()
+        if index_type == 'IVF_FLAT':
+            nlist = self._get_ivf_nlist()
+            nprobe = min(self.config.get('nprobe', int(math.sqrt(nlist))), nlist - 1)
+            params = {"nprobe": max(1, nprobe)}
+        elif index_type == 'FLAT':
+            params = {}
+        else:
+            params = {"ef": self.config.get('hnsw_ef', 64)}
         return {
-            "metric": "IP",
+            "metric_type": "IP",
+            "params": params,
             "offset": 0,
-            "limit": 10,
+            "limit": self.config.get('topk', 10),
         }
 
     def _get_index_params(self) -> Dict[str, Any]:
         """Get index parameters"""
+        index_type = self._resolve_index_type()
+        if index_type == 'IVF_FLAT':
+            return {
+                "index_type": "IVF_FLAT",
+                "metric_type": "IP",
+                "params": {"nlist": self._get_ivf_nlist()},
+            }
+        if index_type == 'FLAT':
+            return {"index_type": "FLAT", "metric_type": "IP", "params": {}}
         return {
-            "index_type": "IVF_FLAT",
-            "metric_type": "L2",
-            "params": {"nlist": 128},
+            "index_type": "HNSW",
+            "metric_type": "IP",
+            "params": {
+                "M": self.config.get('hnsw_M', 16),
+                "efConstruction": self.config.get('hnsw_efC', 200),
+            },
         }
 
+    def _get_collection(self) -> Collection:
+        """Get the cached Collection handle, creating it on first use"""
+        if not self.collection:
+            self.collection = Collection(self.config['collection_name'])
+        return self.collection
+
+    def _get_vector_db(self) -> Milvus:
+        """Get the cached Milvus vector store, creating it on first use"""
+        if self.config.get('vector_dtype', 'fp32') == 'fp16':
+            # The LangChain store searches with fp32 query vectors, which a
+            # FLOAT16_VECTOR field rejects; fail with a clear message instead
+            raise ValueError(
+                "fp16 collections are only searchable via the in-memory cache "
+                "(query with use_rag=False and mem_cache enabled)"
+            )
+        if not self.vector_db:
+            self.vector_db = Milvus(
+                self.embeddings,
+                connection_args=self._get_connection_args(),
+                collection_name=self.config['collection_name'],
+                search_params=self._get_search_params(),
+            )
+        return self.vector_db
+
+    def _invalidate_mem_cache(self):
+        """Drop the in-memory search cache after any write to the collection"""
+        self._mem_vectors = None
+        self._mem_docs = None
+
+    @staticmethod
+    def _decode_vector(value) -> np.ndarray:
+        """Decode one stored vector; FLOAT16_VECTOR payloads arrive as bytes"""
+        if isinstance(value, (bytes, bytearray)):
+            return np.frombuffer(value, dtype=np.float16).astype(np.float32)
+        return np.asarray(value, dtype=np.float32)
+
+    def _load_mem_cache(self):
+        """Pull all vectors and texts into RAM for in-process search"""
+        collection = self._get_collection()
+        collection.load()
+        rows = collection.query(expr="pk >= 0", output_fields=["text", "source", "vector"])
+
+        self._mem_docs = [
+            Document(page_content=row["text"], metadata={"source": row.get("source", "")})
+            for row in rows
+        ]
+        if rows:
+            vectors = np.stack([self._decode_vector(row["vector"]) for row in rows])
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9, None)
+        else:
+            vectors = np.empty((0, self.config.get('dimension', 768)), dtype=np.float32)
+        self._mem_vectors = vectors
+        print(f"Cached {len(rows)} vectors in memory for similarity search")
+
+    def _mem_similarity_search(self, query: str) -> List[Document]:
+        """Top-k inner-product search against the in-memory cache"""
+        if self._mem_vectors is None:
+            self._load_mem_cache()
+
+        k = min(self.config.get('topk', 4), len(self._mem_docs))
+        if k == 0:
+            return []
+
+        q = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        if _HAS_NUMBA:
+            top = _topk_ip(self._mem_vectors, q, k)
+        else:
+            scores = self._mem_vectors @ q
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+        return [self._mem_docs[i] for i in top]
+
+    @staticmethod
+    def _source_expr(file_path: str) -> str:
+        """Build a Milvus filter on source, escaping embedded quotes"""
+        escaped = file_path.replace('\\', '\\\\').replace('"', '\\"')
+        return f'source == "{escaped}"'
+
     def _load_documents(self, file_path: str) -> List:
         """Load documents from file or directory"""
         file_type = self.config.get('file_type', 'pdf').lower()
@@ -117,8 +528,20 @@ class MilvusRAGManager:
         
         elif os.path.isdir(file_path):
             if file_type == 'pdf':
-                loader = PyPDFDirectoryLoader(file_path)
-                documents = loader.load()
+                pdf_files = sorted(glob.glob(os.path.join(file_path, "**/*.pdf"), recursive=True))
+                if not pdf_files:
+                    raise FileNotFoundError(f"No PDF files found in directory: {file_path}")
+
+                # Parse PDFs in parallel; parsing is CPU-bound per file but independent across files
+                workers = int(os.environ.get("RAG_LOAD_THREADS", max(1, (os.cpu_count() or 2) - 1)))
+                workers = min(workers, len(pdf_files))
+                if workers > 1:
+                    with multiprocessing.Pool(workers) as pool:
+                        pages_per_file = pool.map(_load_one_pdf, pdf_files)
+                else:
+                    pages_per_file = [_load_one_pdf(p) for p in pdf_files]
+
+                documents = [page for pages in pages_per_file for page in pages]
                 return self.text_splitter.split_documents(documents)
             else:
                 raise ValueError(f"Unsupported file type for directory: {file_type}")
@@ -126,45 +549,173 @@ class MilvusRAGManager:
         else:
             raise FileNotFoundError(f"File or directory not found: {file_path}")
 
+    def _iter_pdf_paths(self, file_path: str):
+        """Yield PDF paths for a file or (recursively) a directory"""
+        if os.path.isfile(file_path):
+            yield file_path
+        elif os.path.isdir(file_path):
+            pdf_files = sorted(glob.glob(os.path.join(file_path, "**/*.pdf"), recursive=True))
+            if not pdf_files:
+                raise FileNotFoundError(f"No PDF files found in directory: {file_path}")
+            yield from pdf_files
+        else:
+            raise FileNotFoundError(f"File or directory not found: {file_path}")
+
+    def _iter_document_chunks(self, file_path: str):
+        """Lazily parse and split chunks one page at a time
+
+        Keeps memory at O(page) instead of materializing the whole corpus
+        before splitting, so embedding can start as soon as parsing does.
+        """
+        file_type = self.config.get('file_type', 'pdf').lower()
+        if file_type != 'pdf':
+            raise ValueError(f"Unsupported file type: {file_type}")
+
+        for pdf_path in self._iter_pdf_paths(file_path):
+            for page in PyPDFLoader(pdf_path).lazy_load():
+                yield from self.text_splitter.split_documents([page])
+
+    def _ensure_schema(self) -> Collection:
+        """Create the collection with an explicit schema if it doesn't exist
+
+        The chunk shape is fixed, so the schema is declared once instead of
+        letting Milvus.from_documents re-infer it per call; this also lets
+        the vector field be FLOAT16 (half the bytes of FLOAT_VECTOR). The
+        index is created once, here.
+        """
+        if self._schema_ready and self.collection is not None:
+            return self.collection
+
+        collection_name = self.config['collection_name']
+        if utility.has_collection(collection_name):
+            self.collection = Collection(collection_name)
+            self._schema_ready = True
+            return self.collection
+
+        vector_dtype = (
+            DataType.FLOAT16_VECTOR
+            if self.config.get('vector_dtype', 'fp32') == 'fp16'
+            else DataType.FLOAT_VECTOR
+        )
+        schema = CollectionSchema([
+            FieldSchema("pk", DataType.INT64, is_primary=True, auto_id=True),
+            FieldSchema("vector", vector_dtype, dim=self.config.get('dimension', 768)),
+            FieldSchema("text", DataType.VARCHAR, max_length=65535),
+            FieldSchema("source", DataType.VARCHAR, max_length=1024),
+            FieldSchema("page", DataType.INT64),
+        ])
+        self.collection = Collection(collection_name, schema)
+        self.collection.create_index("vector", self._get_index_params())
+        self._schema_ready = True
+        return self.collection
+
+    def _insert_batch(self, batch: List) -> int:
+        """Embed a batch and insert it columnar via collection.insert"""
+        collection = self._ensure_schema()
+
+        texts = [doc.page_content for doc in batch]
+        vectors = np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32)
+        if self.config.get('vector_dtype', 'fp32') == 'fp16':
+            vectors = vectors.astype(np.float16)
+
+        collection.insert([
+            vectors,
+            texts,
+            [doc.metadata.get('source', '') for doc in batch],
+            [int(doc.metadata.get('page', 0) or 0) for doc in batch],
+        ])
+        return len(batch)
+
     def insert_documents(self, file_path: str):
-        """Insert documents into Milvus collection"""
+        """Insert documents into Milvus collection
+
+        Parsing runs on a producer thread feeding a bounded queue while
+        this thread embeds and uploads, so PDF parsing overlaps the
+        embed/insert stages instead of running strictly before them.
+        """
         print(f"Inserting documents from: {file_path}")
-        
-        documents = self._load_documents(file_path)
-        
-        self.vector_db = Milvus.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            connection_args=self._get_connection_args(),
-            collection_name=self.config['collection_name'],
-            search_params=self._get_search_params(),
-            index_params=self._get_index_params(),
-        )
-        
-        print(f"Successfully inserted {len(documents)} document chunks")
+
+        batch_size = self.config.get('insert_batch_size', 512)
+        batch_queue: queue.Queue = queue.Queue(maxsize=4)
+        producer_errors: List[BaseException] = []
+
+        def produce():
+            try:
+                batch = []
+                for chunk in self._iter_document_chunks(file_path):
+                    batch.append(chunk)
+                    if len(batch) >= batch_size:
+                        batch_queue.put(batch)
+                        batch = []
+                if batch:
+                    batch_queue.put(batch)
+            except BaseException as e:
+                producer_errors.append(e)
+            finally:
+                batch_queue.put(None)  # end-of-stream marker
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        total = 0
+        try:
+            while True:
+                batch = batch_queue.get()
+                if batch is None:
+                    break
+                total += self._insert_batch(batch)
+        except BaseException:
+            # Drain to the end-of-stream marker so the producer can't stay
+            # blocked on a full queue after a failed insert
+            while batch_queue.get() is not None:
+                pass
+            producer.join()
+            raise
+
+        producer.join()
+        if producer_errors:
+            raise producer_errors[0]
+
+        if total:
+            self.collection.flush()
+
+        self._exists_cache[file_path] = True
+        self._invalidate_mem_cache()
+        print(f"Successfully inserted {total} document chunks")
 
     def delete_documents(self, file_path: str):
         """Delete documents from Milvus collection"""
-        if not self.collection:
-            self.collection = Collection(self.config['collection_name'])
-        
-        # Query for documents from the specific file
-        res = self.collection.query(
-            expr=f"source == '{file_path}'",
-            output_fields=["pk", "source"]
+        self._get_collection()
+
+        # Iterate matching pks in fixed-size batches so the client never
+        # holds more than one batch, regardless of how large the source is
+        iterator = self.collection.query_iterator(
+            expr=self._source_expr(file_path),
+            output_fields=["pk"],
+            batch_size=10_000,
         )
-        
-        if not res:
+
+        total = 0
+        try:
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    break
+                pks = [row['pk'] for row in rows]
+                self.collection.delete(expr=f"pk in {pks}")
+                total += len(pks)
+        finally:
+            iterator.close()
+
+        if not total:
             print(f"No documents found for file: {file_path}")
             return
-        
-        # Delete each document
-        for doc in res:
-            expr = f"pk in [{doc['pk']}]"
-            self.collection.delete(expr)
-            print(f"Deleted document with pk: {doc['pk']}")
-        
-        print(f"Successfully deleted {len(res)} documents from {file_path}")
+
+        self.collection.flush()
+        self._exists_cache[file_path] = False
+        self._invalidate_mem_cache()
+
+        print(f"Successfully deleted {total} documents from {file_path}")
 
     def update_documents(self, file_path: str):
         """Update documents (delete and re-insert)"""
@@ -179,39 +730,43 @@ class MilvusRAGManager:
 
     def _check_file_exists(self, file_path: str) -> bool:
         """Check if file exists in collection"""
-        if not self.collection:
-            self.collection = Collection(self.config['collection_name'])
-        
+        if file_path in self._exists_cache:
+            return self._exists_cache[file_path]
+
+        self._get_collection()
+
+        # One row is enough to answer existence
         res = self.collection.query(
-            expr=f"source == '{file_path}'",
-            output_fields=["pk", "source"]
+            expr=self._source_expr(file_path),
+            output_fields=["pk"],
+            limit=1
         )
-        
-        return len(res) > 0
 
-    def query_documents(self, query: str, use_rag: bool = True):
+        exists = len(res) > 0
+        self._exists_cache[file_path] = exists
+        return exists
+
+    def query_documents(self, query: str, use_rag: bool = True, new_session: bool = False):
         """Query documents using similarity search or RAG"""
-        if not self.vector_db:
-            self.vector_db = Milvus(
-                self.embeddings,
-                connection_args=self._get_connection_args(),
-                collection_name=self.config['collection_name'],
-            )
-        
         if use_rag:
-            # Use RAG for more comprehensive answers
-            memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
-            pdf_qa = ConversationalRetrievalChain.from_llm(
-                self.llm,
-                self.vector_db.as_retriever(),
-                memory=memory
-            )
-            
-            result = pdf_qa({"question": query})
+            # Build the chain and its memory once; rebuilding per query is
+            # pure overhead for interactive use
+            if self._chain is None or new_session:
+                self._memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+                self._chain = ConversationalRetrievalChain.from_llm(
+                    self.llm,
+                    self._get_vector_db().as_retriever(),
+                    memory=self._memory
+                )
+
+            result = self._chain({"question": query})
             return result["answer"]
         else:
-            # Simple similarity search
-            docs = self.vector_db.similarity_search(query)
+            # Simple similarity search, served from the in-memory cache
+            # when enabled (default) to skip the Milvus round-trip
+            if self.config.get('mem_cache', True):
+                return self._mem_similarity_search(query)
+            docs = self._get_vector_db().similarity_search(query)
             return docs
 
     def list_collections(self):
@@ -224,9 +779,8 @@ class MilvusRAGManager:
 
     def get_collection_stats(self):
         """Get statistics about the current collection"""
-        if not self.collection:
-            self.collection = Collection(self.config['collection_name'])
-        
+        self._get_collection()
+
         stats = self.collection.get_stats()
         print(f"Collection '{self.config['collection_name']}' statistics:")
         print(f"  Row count: {stats.row_count}")
@@ -241,6 +795,11 @@ class MilvusRAGManager:
             print(f"Collection '{collection_name}' dropped successfully")
             self.collection = None
             self.vector_db = None
+            self._schema_ready = False
+            self._chain = None
+            self._memory = None
+            self._exists_cache.clear()
+            self._invalidate_mem_cache()
         else:
             print(f"Collection '{collection_name}' does not exist")
 
@@ -251,18 +810,16 @@ class MilvusRAGManager:
         
         print(f"Loading documents from: {file_path}")
         documents = self._load_documents(file_path)
-        
-        self.vector_db = Milvus.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            connection_args=self._get_connection_args(),
-            collection_name=self.config['collection_name'],
-            search_params=self._get_search_params(),
-            index_params=self._get_index_params(),
-        )
-        
-        print(f"Successfully loaded {len(documents)} document chunks into new collection")
-        self.collection = Collection(self.config['collection_name'])
+
+        batch_size = self.config.get('insert_batch_size', 512)
+        total = 0
+        for i in range(0, len(documents), batch_size):
+            total += self._insert_batch(documents[i:i + batch_size])
+        if total:
+            self.collection.flush()
+
+        print(f"Successfully loaded {total} document chunks into new collection")
+        self._invalidate_mem_cache()
 
 
 def main():